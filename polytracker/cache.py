@@ -59,13 +59,12 @@ class LRUCache(Generic[R, V], MutableMapping):
         self.max_size: Optional[int] = max_size
 
     def get(self, k: R, default: A = NO_DEFAULT) -> Union[V, A]:  # type: ignore
-        try:
+        if k in self._items:
             return self[k]
-        except KeyError:
-            if default is NO_DEFAULT:
-                raise
-            else:
-                return default
+        elif default is NO_DEFAULT:
+            raise KeyError(k)
+        else:
+            return default
 
     def __getitem__(self, k: R) -> V:
         ret = self._items[k]
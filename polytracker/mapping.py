@@ -16,6 +16,9 @@ OffsetType = int
 FileOffsetType = Tuple[Path, OffsetType]
 CavityType = Tuple[OffsetType, OffsetType]
 
+# bytes.translate table mapping every non-zero byte to one
+_NONZERO_TO_ONE = bytes([0] + [1] * 255)
+
 
 class InputOutputMapping:
     def __init__(self, f: TDFile):
@@ -40,40 +43,56 @@ class InputOutputMapping:
 
             yield (lbl, n)
 
-            if isinstance(n, TDSourceNode):
-                continue
-
-            elif isinstance(n, TDUnionNode):
+            # The node classes are never subclassed, so comparing the exact type
+            # is enough
+            if type(n) is TDUnionNode:
                 stack.append(n.left)
                 stack.append(n.right)
 
-            elif isinstance(n, TDRangeNode):
+            elif type(n) is TDRangeNode:
                 stack.extend(range(n.first, n.last + 1))
 
+    def _track_sinks(self) -> Iterator[Tuple[OffsetType, LabelType, int]]:
+        """Enumerates the sink tuples while reporting progress"""
+        return tqdm(
+            self.tdfile.sink_tuples(),
+            total=self.tdfile.sink_count,
+            miniters=1024,
+            mininterval=0.25,
+        )
+
     def mapping(self) -> Dict[FileOffsetType, Set[FileOffsetType]]:
         result: Dict[FileOffsetType, Set[FileOffsetType]] = defaultdict(set)
-        for s in tqdm(list(self.tdfile.sinks)):
-            for _, n in self.dfs_walk(s.label):
-                if isinstance(n, TDSourceNode):
-                    sp = self.tdfile.fd_headers[s.fdidx][0]
-                    np = self.tdfile.fd_headers[n.idx][0]
-                    result[(np, n.offset)].add((sp, s.offset))
+        paths = [path for path, _ in self.tdfile.fd_headers]
+        sources_by_label: Dict[LabelType, List[FileOffsetType]] = {}
+        for sink_offset, sink_label, sink_fdidx in self._track_sinks():
+            sink = (paths[sink_fdidx], sink_offset)
+            sources = sources_by_label.get(sink_label)
+            if sources is None:
+                sources = [
+                    (paths[n.idx], n.offset)
+                    for _, n in self.dfs_walk(sink_label)
+                    if isinstance(n, TDSourceNode)
+                ]
+                sources_by_label[sink_label] = sources
+            for source in sources:
+                result[source].add(sink)
 
         return result
 
     def marker_to_ranges(self, m: bytes) -> List[CavityType]:
+        # Normalize the markers to zero/one, so that the boundaries of each run
+        # of zeros can be located with bytes.find
+        flags = bytes(m).translate(_NONZERO_TO_ONE)
         ranges = []
-        start = None
-        for i, v in enumerate(m):
-            if v == 0:
-                if start is None:
-                    start = i
-            else:
-                if start is not None:
-                    ranges.append((start, i))
-                    start = None
-        if start is not None:
-            ranges.append((start, len(m)))
+        start = flags.find(0)
+        while start != -1:
+            end = flags.find(1, start)
+            if end == -1:
+                ranges.append((start, len(flags)))
+                break
+            ranges.append((start, end))
+            start = flags.find(0, end)
         return ranges
 
     def file_cavities(self) -> Dict[Path, List[CavityType]]:
@@ -87,38 +106,40 @@ class InputOutputMapping:
         # iterating over sinks as any taint node that affects control flow will
         # already have all of its source taints affecting control flow, and thus
         # be in the marker array already.
-        with tqdm(desc="indexing taint sources", unit="labels", leave=False) as t:
-            for source_label in self.tdfile.input_labels():
-                t.update(1)
-                source_node = self.tdfile.decode_node(source_label)
-                assert isinstance(source_node, TDSourceNode)
-                source_index = source_node.idx
-                source_offset = source_node.offset
-
-                if source_index not in markers:
-                    # Attempt to get the size of the file, to prevent reallocation of the markers array.
-                    # Use whatever size is greater (size hint will be zero for failures) to allocate the
-                    # array.
-                    fdheader = self.tdfile.fd_headers[source_index][1]
-                    size = (
-                        source_offset + 1 if fdheader.invalid_size() else fdheader.size
-                    )
-                    markers[source_index] = bytearray(size)
-
-                marker = markers[source_index]
-                if source_offset >= len(marker):
-                    marker = marker.ljust(source_offset + 1, b"\0")
-                    markers[source_index] = marker
-
-                if source_node.affects_control_flow:
-                    marker[source_offset] = 1
+        for source_label in tqdm(
+            self.tdfile.input_labels(),
+            desc="indexing taint sources",
+            unit="labels",
+            leave=False,
+            miniters=1024,
+        ):
+            source_node = self.tdfile.decode_node(source_label)
+            assert isinstance(source_node, TDSourceNode)
+            source_index = source_node.idx
+            source_offset = source_node.offset
+
+            if source_index not in markers:
+                # Attempt to get the size of the file, to prevent reallocation of the markers array.
+                # Use whatever size is greater (size hint will be zero for failures) to allocate the
+                # array.
+                fdheader = self.tdfile.fd_headers[source_index][1]
+                size = source_offset + 1 if fdheader.invalid_size() else fdheader.size
+                markers[source_index] = bytearray(size)
+
+            marker = markers[source_index]
+            if source_offset >= len(marker):
+                marker = marker.ljust(source_offset + 1, b"\0")
+                markers[source_index] = marker
+
+            if source_node.affects_control_flow:
+                marker[source_offset] = 1
 
         # Now, iterate all taint labels written to outputs (sinks). Walk them backwards to reach
         # source nodes and mark any source offset contributing to outputs. If a node affects
         # control flow, it can be disregarded as that would already have spilled into the source
         # node (see above).
-        for s in tqdm(list(self.tdfile.sinks)):
-            sn = self.tdfile.decode_node(s.label)
+        for _, sink_label, _ in self._track_sinks():
+            sn = self.tdfile.decode_node(sink_label)
             if sn.affects_control_flow:
                 continue
 
@@ -127,7 +148,7 @@ class InputOutputMapping:
             if isinstance(sn, TDSourceNode) and not sn.affects_control_flow:
                 markers[sn.idx][sn.offset] = 1
             else:
-                for lbl, n in self.dfs_walk(s.label, seen):
+                for lbl, n in self.dfs_walk(sink_label, seen):
                     if isinstance(n, TDSourceNode):
                         markers[n.idx][n.offset] = 1
                     elif n.affects_control_flow:
@@ -143,7 +164,14 @@ class InputOutputMapping:
         for k, v in markers.items():
             fname = self.tdfile.fd_headers[k][0]
             if fname in merged:
-                merged[fname] = bytes(a | b for (a, b) in zip(merged[fname], v))
+                # OR the markers as two big integers. Only the common prefix
+                # is kept, like zip() would.
+                prev = merged[fname]
+                common = min(len(prev), len(v))
+                merged[fname] = (
+                    int.from_bytes(prev[:common], "little")
+                    | int.from_bytes(v[:common], "little")
+                ).to_bytes(common, "little")
             else:
                 merged[fname] = bytes(v)
 
@@ -9,12 +9,12 @@ from typing import (
     List,
     Set,
     Type,
-    cast,
 )
 
 from enum import Enum
 from pathlib import Path
 from mmap import mmap, PROT_READ
+from struct import Struct
 from ctypes import (
     Structure,
     c_char,
@@ -90,7 +90,7 @@ class TDSourceSection:
 
     def enumerate(self):
         for offset in range(0, len(self.mem), sizeof(TDFDHeader)):
-            yield TDFDHeader.from_buffer_copy(self.mem[offset:])
+            yield TDFDHeader.from_buffer_copy(self.mem, offset)
 
 
 class TDStringSection:
@@ -100,17 +100,17 @@ class TDStringSection:
     Corresponds to StringTableBase in string_table.h.
     """
 
+    length_prefix = Struct("=H")
+
     def __init__(self, mem, hdr):
         self.section = mem[hdr.offset : hdr.offset + hdr.size]
         self.align = hdr.align
 
     def read_string(self, offset):
-        n = c_uint16.from_buffer_copy(self.section[offset:]).value
-        assert len(self.section) >= offset + sizeof(c_uint16) + n
-        return str(
-            self.section[offset + sizeof(c_uint16) : offset + sizeof(c_uint16) + n],
-            "utf-8",
-        )
+        (n,) = self.length_prefix.unpack_from(self.section, offset)
+        start = offset + self.length_prefix.size
+        assert len(self.section) >= start + n
+        return str(self.section[start : start + n], "utf-8")
 
 
 class TDLabelSection:
@@ -122,12 +122,13 @@ class TDLabelSection:
 
     def __init__(self, mem, hdr):
         self.section = mem[hdr.offset : hdr.offset + hdr.size]
+        self.labels = memoryview(self.section).cast("Q")
 
     def read_raw(self, label):
-        return c_uint64.from_buffer_copy(self.section, label * sizeof(c_uint64)).value
+        return self.labels[label]
 
     def count(self):
-        return len(self.section) // sizeof(c_uint64)
+        return len(self.labels)
 
 
 class TDEnterFunctionEvent:
@@ -200,18 +201,20 @@ class TDControlFlowLogSection:
     TAINTED_CONTROL_FLOW = 2
 
     @staticmethod
-    def _decode_varint(buffer):
+    def _decode_varint(buffer, pos):
+        """Decodes the varint starting at `pos`, returning it and the position after it"""
         shift = 0
         val = 0
-        while buffer:
-            curr = c_uint8.from_buffer_copy(buffer, 0).value
+        end = len(buffer)
+        while pos < end:
+            curr = buffer[pos]
+            pos += 1
             val |= (curr & 0x7F) << shift
             shift += 7
-            buffer = buffer[1:]
             if curr & 0x80 == 0:
                 break
 
-        return val, buffer
+        return val, pos
 
     @staticmethod
     def _align_callstack(target_function_id, callstack):
@@ -225,11 +228,12 @@ class TDControlFlowLogSection:
 
     def __iter__(self):
         buffer = self.section
+        pos = 0
+        end = len(buffer)
         callstack = []
-        while buffer:
-            event = c_uint8.from_buffer_copy(buffer, 0).value
-            buffer = buffer[1:]
-            function_id, buffer = TDControlFlowLogSection._decode_varint(buffer)
+        while pos < end:
+            event = buffer[pos]
+            function_id, pos = TDControlFlowLogSection._decode_varint(buffer, pos + 1)
             if self.funcmapping != None:
                 function_id = self.funcmapping[function_id]
 
@@ -238,20 +242,22 @@ class TDControlFlowLogSection:
                 yield TDEnterFunctionEvent(callstack[:])
             elif event == TDControlFlowLogSection.LEAVE_FUNCTION:
                 # Align call stack, if needed
-                yield from TDControlFlowLogSection._align_callstack(
-                    function_id, callstack
-                )
+                if callstack and callstack[-1] != function_id:
+                    yield from TDControlFlowLogSection._align_callstack(
+                        function_id, callstack
+                    )
 
                 # TODO(hbrodin): If the callstack doesn't contain function_id at all, this will break.
                 yield TDLeaveFunctionEvent(callstack[:])
                 callstack.pop()
             else:
                 # Align call stack, if needed
-                yield from TDControlFlowLogSection._align_callstack(
-                    function_id, callstack
-                )
+                if callstack and callstack[-1] != function_id:
+                    yield from TDControlFlowLogSection._align_callstack(
+                        function_id, callstack
+                    )
 
-                label, buffer = TDControlFlowLogSection._decode_varint(buffer)
+                label, pos = TDControlFlowLogSection._decode_varint(buffer, pos)
                 yield TDTaintedControlFlowEvent(callstack[:], label)
 
         # Drain callstack with artificial TDLeaveFunction events (using a dummy function id that doesn't exist)
@@ -272,9 +278,20 @@ class TDSinkSection:
     def __init__(self, mem, hdr):
         self.section = mem[hdr.offset : hdr.offset + hdr.size]
 
-    def enumerate(self):
+    def __len__(self) -> int:
+        return len(self.section) // sizeof(TDSink)
+
+    def enumerate(self, raw: bool = False):
+        """Enumerates all sink entries
+
+        If `raw` is set, plain `(offset, label, fdidx)` tuples are yielded instead
+        of TDSink instances.
+        """
+        if raw:
+            yield from TDSINK_RAW.iter_unpack(self.section)
+            return
         for offset in range(0, len(self.section), sizeof(TDSink)):
-            yield TDSink.from_buffer_copy(self.section[offset:])
+            yield TDSink.from_buffer_copy(self.section, offset)
 
 
 class TDBitmapSection:
@@ -288,23 +305,20 @@ class TDBitmapSection:
     def __init__(self, mem, hdr):
         self.section = mem[hdr.offset : hdr.offset + hdr.size]
         assert len(self.section) % 8 == 0  # Multiple of uint64_t
+        self.buckets = memoryview(self.section).cast("Q")
 
     def enumerate_set_bits(self):
         """Enumerates all bits that are set
 
         The index of each bit that is set will be yielded.
         """
-        index = 0
-        for offset in range(0, len(self.section), sizeof(c_uint64)):
-            bucket = c_uint64.from_buffer_copy(self.section, offset).value
-            if bucket == 0:
-                index += 64  # No bits set, just advance the bit index
-            else:
-                # At least one bit is set, iterate over all bits and yield set bits
-                for i in range(0, 64):
-                    if (bucket >> i) & 1:
-                        yield index
-                    index += 1
+        for bucket_index, bucket in enumerate(self.buckets):
+            # Visit the set bits only, by repeatedly clearing the lowest one
+            index = bucket_index * 64
+            while bucket:
+                lowest = bucket & -bucket
+                yield index + lowest.bit_length() - 1
+                bucket ^= lowest
 
 
 class TDSourceIndexSection(TDBitmapSection):
@@ -331,6 +345,17 @@ class TDEventsSection:
         self.section = mem[hdr.offset : hdr.offset + hdr.size]
 
     def __iter__(self):
+        return self.enumerate()
+
+    def enumerate(self, raw: bool = False):
+        """Enumerates all function trace events
+
+        If `raw` is set, plain `(kind, fnidx)` tuples are yielded instead of
+        TDEvent instances.
+        """
+        if raw:
+            yield from TDEVENT_RAW.iter_unpack(self.section)
+            return
         for offset in range(0, len(self.section), sizeof(TDEvent)):
             yield TDEvent.from_buffer_copy(self.section, offset)
 
@@ -424,6 +449,14 @@ class TDEvent(Structure):
         return f"kind: {self.Kind(self.kind).name} fnidx: {self.fnidx}"
 
 
+# Layouts of TDSink and TDEvent for unpacking them as plain tuples. Must be
+# kept in sync with the `_fields_` above, including the alignment padding.
+TDSINK_RAW = Struct("=qIBxxx")
+TDEVENT_RAW = Struct("=BxH")
+assert TDSINK_RAW.size == sizeof(TDSink)
+assert TDEVENT_RAW.size == sizeof(TDEvent)
+
+
 TDSection = Union[
     TDLabelSection,
     TDSourceSection,
@@ -449,6 +482,8 @@ class TDFile:
         self.source_offset_mask = (1 << 54) - 1
 
         self.buffer = mmap(file.fileno(), 0, prot=PROT_READ)
+        # Slicing the mmap itself copies, so sections slice a view of it
+        self.view = memoryview(self.buffer)
 
         self.filemeta = TDFileMeta.from_buffer_copy(self.buffer)
         section_offset = sizeof(TDFileMeta)
@@ -457,39 +492,42 @@ class TDFile:
         for i in range(0, self.filemeta.section_count):
             hdr = TDSectionMeta.from_buffer_copy(self.buffer, section_offset)
             if hdr.tag == 1:
-                self.sections.append(TDSourceSection(self.buffer, hdr))
+                self.sections.append(TDSourceSection(self.view, hdr))
                 self.sections_by_type[TDSourceSection] = self.sections[-1]
             elif hdr.tag == 2:
-                self.sections.append(TDLabelSection(self.buffer, hdr))
+                self.sections.append(TDLabelSection(self.view, hdr))
                 self.sections_by_type[TDLabelSection] = self.sections[-1]
             elif hdr.tag == 3:
-                self.sections.append(TDStringSection(self.buffer, hdr))
+                self.sections.append(TDStringSection(self.view, hdr))
                 self.sections_by_type[TDStringSection] = self.sections[-1]
             elif hdr.tag == 4:
-                self.sections.append(TDSinkSection(self.buffer, hdr))
+                self.sections.append(TDSinkSection(self.view, hdr))
                 self.sections_by_type[TDSinkSection] = self.sections[-1]
             elif hdr.tag == 5:
-                self.sections.append(TDSourceIndexSection(self.buffer, hdr))
+                self.sections.append(TDSourceIndexSection(self.view, hdr))
                 self.sections_by_type[TDSourceIndexSection] = self.sections[-1]
             elif hdr.tag == 6:
-                self.sections.append(TDFunctionsSection(self.buffer, hdr))
+                self.sections.append(TDFunctionsSection(self.view, hdr))
                 self.sections_by_type[TDFunctionsSection] = self.sections[-1]
             elif hdr.tag == 7:
-                self.sections.append(TDEventsSection(self.buffer, hdr))
+                self.sections.append(TDEventsSection(self.view, hdr))
                 self.sections_by_type[TDEventsSection] = self.sections[-1]
             elif hdr.tag == 8:
-                self.sections.append(TDControlFlowLogSection(self.buffer, hdr))
+                self.sections.append(TDControlFlowLogSection(self.view, hdr))
                 self.sections_by_type[TDControlFlowLogSection] = self.sections[-1]
             else:
                 raise NotImplementedError("Unsupported section tag")
 
             section_offset += sizeof(TDSectionMeta)
 
-        self.raw_nodes: Dict[int, int] = {}
+        self._label_count: Optional[int] = None
         self.sink_cache: Dict[int, TDSink] = {}
 
         self.fd_headers: List[Tuple[Path, TDFDHeader]] = list(self.read_fd_headers())
         self.fn_headers: List[Tuple[str, TDFnHeader]] = list(self.read_fn_headers())
+        self.fn_indices: Dict[str, int] = {
+            name: i for i, (name, _) in enumerate(self.fn_headers)
+        }
 
     def _get_section(self, wanted_type: Type[TDSection]) -> TDSection:
         return self.sections_by_type[wanted_type]
@@ -521,20 +559,17 @@ class TDFile:
         return source_index_section.enumerate_set_bits()
 
     @property
-    def label_count(self):
-        label_section = self.sections_by_type[TDLabelSection]
-        assert isinstance(label_section, TDLabelSection)
-        return label_section.count()
+    def label_count(self) -> int:
+        if self._label_count is None:
+            label_section = self.sections_by_type[TDLabelSection]
+            assert isinstance(label_section, TDLabelSection)
+            self._label_count = label_section.count()
+        return self._label_count
 
     def read_node(self, label: int) -> int:
-        if label in self.raw_nodes:
-            return self.raw_nodes[label]
         label_section = self.sections_by_type[TDLabelSection]
         assert isinstance(label_section, TDLabelSection)
-        result = label_section.read_raw(label)
-
-        self.raw_nodes[label] = result
-        return result
+        return label_section.read_raw(label)
 
     def decode_node(self, label: int) -> TDNode:
         # Label zero represents untainted data
@@ -558,6 +593,51 @@ class TDFile:
             else:
                 return TDRangeNode(v1, v2, affects_cf)
 
+    def source_tuples(self, labels: Iterable[int]) -> Iterator[Tuple[int, int]]:
+        """Enumerates the source nodes reachable from `labels` as `(idx, offset)`
+
+        The transitive closure is computed on the raw label values, with range
+        nodes expanded in place.
+        """
+        # This needs to be kept in sync with implementation in encoding.cpp
+        source_bit = 1 << self.source_taint_bit_shift
+        val1_shift = self.val1_shift
+        label_mask = self.label_mask
+        idx_mask = self.source_index_mask
+        idx_bits = self.source_index_bits
+        offset_mask = self.source_offset_mask
+
+        # Label zero is untainted and never visited
+        seen: Set[int] = {0}
+        stack = list(labels)
+        label_section = self.sections_by_type[TDLabelSection]
+        assert isinstance(label_section, TDLabelSection)
+        values = label_section.labels
+
+        pop = stack.pop
+        push = stack.append
+        visit = seen.add
+        while stack:
+            label = pop()
+            if label in seen:
+                continue
+            visit(label)
+
+            v = values[label]
+            if v & source_bit:
+                yield v & idx_mask, (v >> idx_bits) & offset_mask
+                continue
+
+            v1 = (v >> val1_shift) & label_mask
+            v2 = v & label_mask
+            if v1 > v2:
+                if v1 not in seen:
+                    push(v1)
+                if v2 not in seen:
+                    push(v2)
+            else:
+                stack.extend(range(v1, v2 + 1))
+
     @property
     def nodes(self) -> Iterator[TDNode]:
         for label in range(1, self.label_count):
@@ -569,6 +649,18 @@ class TDFile:
         assert isinstance(sink_section, TDSinkSection)
         yield from sink_section.enumerate()
 
+    @property
+    def sink_count(self) -> int:
+        sink_section = self.sections_by_type[TDSinkSection]
+        assert isinstance(sink_section, TDSinkSection)
+        return len(sink_section)
+
+    def sink_tuples(self) -> Iterator[Tuple[int, int, int]]:
+        """Enumerates all sinks as `(offset, label, fdidx)` tuples"""
+        sink_section = self.sections_by_type[TDSinkSection]
+        assert isinstance(sink_section, TDSinkSection)
+        return sink_section.enumerate(raw=True)
+
     def read_event(self, offset: int) -> TDEvent:
         return TDEvent.from_buffer_copy(self.buffer, offset)
 
@@ -578,6 +670,12 @@ class TDFile:
         assert isinstance(events_section, TDEventsSection)
         yield from events_section
 
+    def event_tuples(self) -> Iterator[Tuple[int, int]]:
+        """Enumerates all function trace events as `(kind, fnidx)` tuples"""
+        events_section = self.sections_by_type[TDEventsSection]
+        assert isinstance(events_section, TDEventsSection)
+        return events_section.enumerate(raw=True)
+
 
 class TDTaintOutput(TaintOutput):
     def __init__(self, source: Input, output_offset: int, label: int):
@@ -591,7 +689,7 @@ class TDProgramTrace(ProgramTrace):
     def __init__(self, file: BinaryIO) -> None:
         self.tdfile: TDFile = TDFile(file)
         self.tforest: TDTaintForest = TDTaintForest(self)
-        self._inputs = None
+        self._sources: Dict[int, Input] = {}
 
     def __contains__(self, uid: int):
         return super().__contains__(uid)
@@ -612,8 +710,29 @@ class TDProgramTrace(ProgramTrace):
     def basic_blocks(self) -> Iterable[BasicBlock]:
         raise NotImplementedError()
 
+    def taints(self, nodes: Iterable[TaintForestNode]) -> Taints:
+        # Synthetic nodes only exist in the taint forest, so map them back to
+        # the labels they were unfolded from
+        labels: List[int] = []
+        stack = [node.label for node in nodes]
+        while stack:
+            label = stack.pop()
+            if label < 0:
+                parents = self.tforest.get_node(label).parent_labels
+                assert parents is not None
+                stack.extend(parents)
+            else:
+                labels.append(label)
+
+        return Taints(
+            ByteOffset(self.source(idx), offset)
+            for idx, offset in self.tdfile.source_tuples(labels)
+        )
+
     def file_offset(self, node: TaintForestNode) -> ByteOffset:
         assert node.source is not None
+        if isinstance(node, TDTaintForestNode) and node.offset is not None:
+            return ByteOffset(node.source, node.offset)
         tdnode: TDNode = self.tdfile.decode_node(node.label)
         assert isinstance(tdnode, TDSourceNode)
         return ByteOffset(node.source, tdnode.offset)
@@ -632,16 +751,31 @@ class TDProgramTrace(ProgramTrace):
         raise NotImplementedError()
 
     def has_function(self, name: str) -> bool:
-        raise NotImplementedError()
+        return name in self.tdfile.fn_indices
 
     @property
     def num_accesses(self) -> int:
         raise NotImplementedError()
 
+    def num_function_calls(self) -> int:
+        entry = TDEvent.Kind.ENTRY.value
+        return sum(1 for kind, _ in self.tdfile.event_tuples() if kind == entry)
+
     @property
     def outputs(self) -> Optional[Iterable[Input]]:
         return super().outputs
 
+    def source(self, idx: int) -> Input:
+        """Returns the Input for the source with file descriptor header index `idx`
+
+        Inputs are created once per source and shared by every node, offset and
+        output referring to it.
+        """
+        if idx not in self._sources:
+            path, fdhdr = self.tdfile.fd_headers[idx]
+            self._sources[idx] = Input(fdhdr.fd, str(path), fdhdr.size)
+        return self._sources[idx]
+
     @staticmethod
     @PolyTrackerREPL.register("load_trace_tdag")
     def load(tdpath: Union[str, Path]) -> "TDProgramTrace":
@@ -654,40 +788,32 @@ class TDProgramTrace(ProgramTrace):
         # to determine if a file header is an input or not. Consider
         # implementation alternatives.
         seen: Set[int] = set()
+        source_index_mask = self.tdfile.source_index_mask
         for source_label in self.tdfile.input_labels():
-            source_node = self.tdfile.decode_node(source_label)
-            assert isinstance(source_node, TDSourceNode)
-            if source_node.idx not in seen:
-                path, fd_header = self.tdfile.fd_headers[source_node.idx]
-                yield Input(fd_header.fd, str(path), fd_header.size)
-                seen.add(source_node.idx)
+            idx = self.tdfile.read_node(source_label) & source_index_mask
+            if idx not in seen:
+                yield self.source(idx)
+                seen.add(idx)
 
     @property
     def output_taints(self) -> Iterator[TDTaintOutput]:
-        for sink in self.tdfile.sinks:
-            path, fdhdr = self.tdfile.fd_headers[sink.fdidx]
-            offset = sink.offset
-            label = sink.label
-            yield TDTaintOutput(
-                Input(fdhdr.fd, str(path), fdhdr.size),
-                offset,
-                label,
-            )
+        for offset, label, fdidx in self.tdfile.sink_tuples():
+            yield TDTaintOutput(self.source(fdidx), offset, label)
 
     @property
     def taint_forest(self) -> TaintForest:
         return self.tforest
 
     def inputs_affecting_control_flow(self) -> Taints:
-        result: Set[ByteOffset] = set()
+        def byte_offsets() -> Iterator[ByteOffset]:
+            for source_label in self.tdfile.input_labels():
+                source_node = self.tdfile.decode_node(source_label)
+                if source_node.affects_control_flow:
+                    assert isinstance(source_node, TDSourceNode)
+                    source = self.source(source_node.idx)
+                    yield ByteOffset(source, source_node.offset)
 
-        for source_label in self.tdfile.input_labels():
-            source_node = self.tdfile.decode_node(source_label)
-            if source_node.affects_control_flow:
-                tf_node = self.taint_forest.get_node(source_label)
-                result.add(self.file_offset(tf_node))
-
-        return Taints(result)
+        return Taints(byte_offsets())
 
 
 class TDTaintForestNode(TaintForestNode):
@@ -698,10 +824,16 @@ class TDTaintForestNode(TaintForestNode):
         source: Optional[Input],
         affected_control_flow: bool = False,
         parent_labels: Optional[Tuple[int, int]] = None,
+        offset: Optional[int] = None,
     ):
         super().__init__(label, source, affected_control_flow)
         self.forest: TDTaintForest = forest
         self.parents: Optional[Tuple[int, int]] = parent_labels
+        # Offset into `source`, for source nodes only
+        self.offset: Optional[int] = offset
+        self._parent_nodes: Optional[
+            Tuple["TDTaintForestNode", "TDTaintForestNode"]
+        ] = None
 
     def __repr__(self):
         return (
@@ -716,29 +848,38 @@ class TDTaintForestNode(TaintForestNode):
     def parent_labels(self) -> Optional[Tuple[int, int]]:
         return self.parents
 
-    @property
-    def parent_one(self) -> Optional["TDTaintForestNode"]:
+    def resolve_parents(
+        self,
+    ) -> Optional[Tuple["TDTaintForestNode", "TDTaintForestNode"]]:
+        """Returns both parent nodes, resolving them together on first access"""
         if self.parents is None:
             return None
 
-        return self.forest.get_node(self.parents[0])
+        if self._parent_nodes is None:
+            self._parent_nodes = (
+                self.forest.get_node(self.parents[0]),
+                self.forest.get_node(self.parents[1]),
+            )
+
+        return self._parent_nodes
 
     @property
-    def parent_two(self) -> Optional["TDTaintForestNode"]:
-        if self.parents is None:
-            return None
+    def parent_one(self) -> Optional["TDTaintForestNode"]:
+        parents = self.resolve_parents()
+        return None if parents is None else parents[0]
 
-        return self.forest.get_node(self.parents[1])
+    @property
+    def parent_two(self) -> Optional["TDTaintForestNode"]:
+        parents = self.resolve_parents()
+        return None if parents is None else parents[1]
 
 
 class TDTaintForest(TaintForest):
     def __init__(self, trace: TDProgramTrace) -> None:
         self.trace: TDProgramTrace = trace
-        self.node_cache: Dict[int, Optional[TDTaintForestNode]] = {}
+        self.node_cache: Dict[int, TDTaintForestNode] = {}
 
         self.node_cache[0] = TDTaintForestNode(self, 0, None)
-        for i in range(1, self.trace.tdfile.label_count):
-            self.node_cache[i] = None
 
         self.synth_label_cnt: int = -1
 
@@ -746,7 +887,8 @@ class TDTaintForest(TaintForest):
         raise NotImplementedError()
 
     def __len__(self) -> int:
-        return len(self.node_cache)
+        # All labels in the file plus the synthetic nodes created so far
+        return self.trace.tdfile.label_count + (-1 - self.synth_label_cnt)
 
     def get_synth_node_label(self) -> int:
         result = self.synth_label_cnt
@@ -757,9 +899,10 @@ class TDTaintForest(TaintForest):
         node = self.trace.tdfile.decode_node(label)
 
         if isinstance(node, TDSourceNode):
-            path, fdhdr = self.trace.tdfile.fd_headers[node.idx]
-            source = Input(fdhdr.fd, str(path), fdhdr.size)
-            return TDTaintForestNode(self, label, source, node.affects_control_flow)
+            source = self.trace.source(node.idx)
+            return TDTaintForestNode(
+                self, label, source, node.affects_control_flow, offset=node.offset
+            )
 
         elif isinstance(node, TDUnionNode):
             return TDTaintForestNode(
@@ -798,8 +941,12 @@ class TDTaintForest(TaintForest):
     def get_node(self, label: int, source: Optional[Input] = None) -> TDTaintForestNode:
         assert source is None
 
-        if self.node_cache[label] is not None:
-            return cast(TDTaintForestNode, self.node_cache[label])
+        cached = self.node_cache.get(label)
+        if cached is not None:
+            return cached
+
+        if not 0 < label < self.trace.tdfile.label_count:
+            raise KeyError(label)
 
         result = self.create_node(label)
 
@@ -808,9 +955,18 @@ class TDTaintForest(TaintForest):
         return result
 
     def nodes(self) -> Iterator[TDTaintForestNode]:
-        label = max(self.node_cache.keys())
-        while label in self.node_cache:
-            yield self.get_node(label)
+        # Synthetic labels are created while unfolding range nodes, so the lower
+        # bound moves as the iteration goes on.
+        label = self.trace.tdfile.label_count - 1
+        while label > self.synth_label_cnt:
+            node = self.node_cache.get(label)
+            if node is None:
+                # Only unfolded range nodes are cached; unfolding one again
+                # would create a second set of synthetic nodes
+                node = self.create_node(label)
+                if node.parents is not None and node.parents[0] < 0:
+                    self.node_cache[label] = node
+            yield node
             label -= 1
 
 
@@ -49,11 +49,22 @@ class TaintForestNode:
 
 
 class TaintForest:
+    """A forest of taint nodes in which each label identifies exactly one node
+
+    Traversals such as :meth:`ProgramTrace.taints` rely on this and track the
+    nodes they visited by label alone, irrespective of the nodes' sources.
+    """
+
     @abstractmethod
     def nodes(self) -> Iterator[TaintForestNode]:
         """Iterates over the nodes in order of decreasing label"""
         raise NotImplementedError()
 
+    def node_tuples(self) -> Iterator[Tuple[int, Optional[Tuple[int, int]]]]:
+        """Iterates over `(label, parent_labels)` in order of decreasing label"""
+        for node in self.nodes():
+            yield node.label, node.parent_labels
+
     @abstractmethod
     def get_node(self, label: int, source: Optional[Input] = None) -> TaintForestNode:
         raise NotImplementedError()
@@ -65,13 +76,11 @@ class TaintForest:
     def to_graph(self) -> DAG[TaintForestNode]:
         dag: nx.DiGraph = nx.DiGraph()
 
-        for node in self:
-            dag.add_node(node.label)
-            if node.parent_one:
-                dag.add_edge(node.parent_one.label, node.label)
-
-            if node.parent_two:
-                dag.add_edge(node.parent_two.label, node.label)
+        for label, parents in self.node_tuples():
+            dag.add_node(label)
+            if parents is not None:
+                dag.add_edge(parents[0], label)
+                dag.add_edge(parents[1], label)
 
         return DAG(dag)
 
@@ -74,6 +74,8 @@ class ByteAccessType(IntFlag):
 class TaintedRegion:
     """Base class representing a tainted region of code"""
 
+    __slots__ = "source", "offset", "length"
+
     def __init__(self, source: Input, offset: int, length: int):
         """Initializes a tainted region.
 
@@ -125,7 +127,8 @@ class TaintedRegion:
         return self.value
 
     def __hash__(self):
-        return hash((self.source, self.offset))
+        # Consistent with __eq__, as equal inputs have equal uids
+        return hash((self.source.uid, self.offset))
 
     def __eq__(self, other):
         return (
@@ -150,6 +153,8 @@ class TaintedRegion:
 class ByteOffset(TaintedRegion):
     """A :class:`TaintedRegion` of length 1."""
 
+    __slots__ = ()
+
     def __init__(self, source: Input, offset: int):
         super().__init__(source=source, offset=offset, length=1)
 
@@ -335,11 +340,7 @@ class Taints:
                 return False
 
         """
-        try:
-            next(iter(self.find(byte_sequence)))
-            return True
-        except StopIteration:
-            return False
+        return next(iter(self.find(byte_sequence)), None) is not None
 
     def __len__(self):
         """The total number of tainted bytes in this collection."""
@@ -364,8 +365,10 @@ class Taints:
 
             bool(len(self))
 
+        but stops at the first source with at least one tainted byte rather than counting them all.
+
         """
-        return bool(len(self))
+        return any(self._offsets_by_source.values())
 
 
 class Function:
@@ -1135,32 +1138,39 @@ class ProgramTrace(ABC):
         )
 
     def taints(self, nodes: Iterable[TaintForestNode]) -> Taints:
-        seen: Set[TaintForestNode] = set(nodes)
-        stack: List[TaintForestNode] = list(seen)
-        result: Set[ByteOffset] = set()
+        # Track visited nodes by label, which is unique within a taint forest
+        seeds: Dict[int, TaintForestNode] = {node.label: node for node in nodes}
+        stack: List[TaintForestNode] = list(seeds.values())
+        seen: Set[int] = set(seeds)
+        # Taints deduplicates the offsets itself
+        result: List[ByteOffset] = []
+        pop = stack.pop
+        push = stack.append
+        visit = seen.add
         while stack:
-            node = stack.pop()
+            node = pop()
+
+            parents = node.parent_labels
+            if parents is None:
+                result.append(self.file_offset(node))
+                continue
 
-            if node in seen:
+            label1, label2 = parents
+            if label1 in seen and label2 in seen:
                 continue
 
+            # a node will always have either zero or two parents.
+            # labels that are reused will reuse their associated nodes.
+            # all other nodes are unions.
             p1 = node.parent_one
             p2 = node.parent_two
-
-            if p1 is None:
-                assert p2 is None
-                result.add(self.file_offset(node))
-            else:
-                # a node will always have either zero or two parents.
-                # labels that are reused will reuse their associated nodes.
-                # all other nodes are unions.
-                assert p1 is not None and p2 is not None
-                if p1 not in seen:
-                    seen.add(p1)
-                    stack.append(p1)
-                if p2 not in seen:
-                    seen.add(p2)
-                    stack.append(p2)
+            assert p1 is not None and p2 is not None
+            if label1 not in seen:
+                visit(label1)
+                push(p1)
+            if label2 not in seen:
+                visit(label2)
+                push(p2)
 
         return Taints(result)
 
@@ -1190,10 +1200,7 @@ class ProgramTrace(ABC):
     ) -> Optional[FunctionEntry]:
         """Returns the next function entry, or None if none exists"""
         if after is None:
-            try:
-                return next(iter(self.function_trace()))
-            except StopIteration:
-                return None
+            return next(iter(self.function_trace()), None)
         function_return = after.function_return
         if function_return is None:
             next_event = after.next_control_flow_event
@@ -1207,10 +1214,10 @@ class ProgramTrace(ABC):
     @property
     def entrypoint(self) -> Optional[FunctionInvocation]:
         """Returns the entrypoint to this trace (*i.e.*, its first :class:`FunctionInvocation`, typically ``main``)."""
-        try:
-            return FunctionInvocation(next(iter(self.function_trace())))
-        except StopIteration:
+        entry = next(iter(self.function_trace()), None)
+        if entry is None:
             return None
+        return FunctionInvocation(entry)
 
     @abstractmethod
     def __getitem__(self, uid: int) -> TraceEvent:
@@ -1,3 +1,5 @@
+import pytest
+
 from polytracker.cache import LRUCache
 
 
@@ -26,3 +28,16 @@ def test_cache():
     assert list(cache) == [8, 9, 10, 11, 1, 3, 4, 5, 6, 7]
     for number, string in cache.items():
         assert str(number) == string
+
+
+def test_cache_get():
+    cache: LRUCache[int, str] = LRUCache(max_size=2)
+    cache[0] = "0"
+    cache[1] = "1"
+    assert cache.get(0) == "0"
+    assert cache.get(2, None) is None
+    with pytest.raises(KeyError):
+        cache.get(2)
+    # reading through get() refreshes an entry just like indexing does
+    cache[2] = "2"
+    assert list(cache) == [0, 2]
@@ -23,3 +23,12 @@ def test_fntrace(program_trace: ProgramTrace):
     for e in events:
         kinds[e.kind] += 1
     assert kinds[taint_dag.TDEvent.Kind.ENTRY] == kinds[taint_dag.TDEvent.Kind.EXIT]
+    assert program_trace.num_function_calls() == len(events) // 2
+
+
+@pytest.mark.program_trace("test_fntrace.cpp")
+def test_has_function(program_trace: ProgramTrace):
+    assert isinstance(program_trace, taint_dag.TDProgramTrace)
+    assert program_trace.has_function("main")
+    assert program_trace.has_function("_Z9factoriali")
+    assert not program_trace.has_function("factorial")
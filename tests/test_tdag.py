@@ -46,6 +46,7 @@ def test_td_taint_forest(program_trace: ProgramTrace):
     # Range node unfolding
     nodes = list(tdforest.nodes())
     assert len(nodes) - abs(tdforest.synth_label_cnt) + 1 == tdfile.label_count
+    assert list(tdforest.node_tuples()) == [(n.label, n.parent_labels) for n in nodes]
     # Basic node properties
     n1 = tdforest.get_node(1)
     assert n1.parent_labels is None
@@ -186,4 +187,19 @@ def test_inputs_affecting_control_flow(input_file: Path, program_trace: ProgramT
     assert regions[1].length == 2
 
 
+@pytest.mark.program_trace("test_tdag.cpp")
+def test_taints(input_file: Path, program_trace: ProgramTrace):
+    assert isinstance(program_trace, taint_dag.TDProgramTrace)
+
+    tdforest = program_trace.taint_forest
+    # Label 12 is the range of the first four source labels
+    taints = program_trace.taints([tdforest.get_node(12)])
+    assert len(taints) == 4
+    regions = list(taints.regions())
+    assert len(regions) == 1
+    assert regions[0].source.path == str(input_file)
+    assert regions[0].offset == 0
+    assert regions[0].length == 4
+
+
 # TODO (hbrodin): Add a test case when the input file size cannot be determined, e.g. stdin
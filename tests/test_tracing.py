@@ -0,0 +1,186 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from polytracker import (
+    BasicBlock,
+    ByteOffset,
+    Function,
+    TaintAccess,
+    TaintForest,
+    TaintOutput,
+)
+from polytracker.inputs import Input
+from polytracker.taint_forest import TaintForestNode
+from polytracker.tracing import ProgramTrace, TraceEvent
+
+
+class TaintForestNodeMock(TaintForestNode):
+    def __init__(
+        self,
+        forest: "TaintForestMock",
+        label: int,
+        source: Optional[Input] = None,
+        offset: Optional[int] = None,
+        parents: Optional[Tuple[int, int]] = None,
+    ):
+        super().__init__(label, source)
+        self.forest: TaintForestMock = forest
+        self.offset: Optional[int] = offset
+        self.parents: Optional[Tuple[int, int]] = parents
+        self.resolved: int = 0
+
+    @property
+    def parent_labels(self) -> Optional[Tuple[int, int]]:
+        return self.parents
+
+    @property
+    def parent_one(self) -> Optional[TaintForestNode]:
+        if self.parents is None:
+            return None
+        self.resolved += 1
+        return self.forest.get_node(self.parents[0])
+
+    @property
+    def parent_two(self) -> Optional[TaintForestNode]:
+        if self.parents is None:
+            return None
+        self.resolved += 1
+        return self.forest.get_node(self.parents[1])
+
+
+class TaintForestMock(TaintForest):
+    def __init__(self):
+        self.nodes_by_label: Dict[int, TaintForestNodeMock] = {}
+
+    def add(self, label: int, **kwargs) -> TaintForestNodeMock:
+        node = TaintForestNodeMock(self, label, **kwargs)
+        self.nodes_by_label[label] = node
+        return node
+
+    def nodes(self) -> Iterator[TaintForestNode]:
+        return iter(sorted(self.nodes_by_label.values(), reverse=True))
+
+    def get_node(self, label: int, source: Optional[Input] = None) -> TaintForestNode:
+        return self.nodes_by_label[label]
+
+    def __getitem__(self, label: int) -> Iterator[TaintForestNode]:
+        return iter((self.nodes_by_label[label],))
+
+    def __len__(self) -> int:
+        return len(self.nodes_by_label)
+
+
+class TraceMock(ProgramTrace):
+    def __init__(self, forest: TaintForestMock):
+        self.forest: TaintForestMock = forest
+
+    def __len__(self) -> int:
+        return 0
+
+    def __iter__(self) -> Iterator[TraceEvent]:
+        return iter(())
+
+    @property
+    def functions(self) -> Iterable[Function]:
+        return ()
+
+    @property
+    def basic_blocks(self) -> Iterable[BasicBlock]:
+        return ()
+
+    def has_event(self, uid: int) -> bool:
+        return False
+
+    def get_event(self, uid: int) -> TraceEvent:
+        raise KeyError(uid)
+
+    def get_function(self, name: str) -> Function:
+        raise KeyError(name)
+
+    def has_function(self, name: str) -> bool:
+        return False
+
+    def access_sequence(self) -> Iterator[TaintAccess]:
+        return iter(())
+
+    @property
+    def num_accesses(self) -> int:
+        return 0
+
+    @property
+    def inputs(self) -> Iterable[Input]:
+        return ()
+
+    @property
+    def outputs(self) -> Optional[Iterable[Input]]:
+        return None
+
+    @property
+    def output_taints(self) -> Iterable[TaintOutput]:
+        return ()
+
+    @property
+    def taint_forest(self) -> TaintForest:
+        return self.forest
+
+    def file_offset(self, node: TaintForestNode) -> ByteOffset:
+        assert isinstance(node, TaintForestNodeMock)
+        assert node.source is not None and node.offset is not None
+        return ByteOffset(node.source, node.offset)
+
+    def __getitem__(self, uid: int) -> TraceEvent:
+        raise KeyError(uid)
+
+    def __contains__(self, uid: int):
+        return False
+
+
+def diamond_forest(source: Input) -> TaintForestMock:
+    """Label 7 unions 5 and 6, which share the source label 2"""
+    forest = TaintForestMock()
+    for label in range(1, 5):
+        forest.add(label, source=source, offset=label * 10)
+    forest.add(5, parents=(2, 1))
+    forest.add(6, parents=(3, 2))
+    forest.add(7, parents=(6, 5))
+    forest.add(8, parents=(7, 4))
+    return forest
+
+
+def offsets(nodes: Iterable[ByteOffset]) -> List[Tuple[int, int]]:
+    return sorted((offset.source.uid, offset.offset) for offset in nodes)
+
+
+def test_taints():
+    source = Input(uid=1, path="test.data", size=50)
+    forest = diamond_forest(source)
+    trace = TraceMock(forest)
+
+    assert offsets(trace.taints([forest.get_node(2)])) == [(1, 20)]
+    assert offsets(trace.taints([forest.get_node(8)])) == [
+        (1, 10),
+        (1, 20),
+        (1, 30),
+        (1, 40),
+    ]
+    # Duplicate and overlapping seeds contribute each offset only once
+    seeds = [forest.get_node(5), forest.get_node(7), forest.get_node(5)]
+    assert offsets(trace.taints(seeds)) == [(1, 10), (1, 20), (1, 30)]
+
+
+def test_taints_skips_visited_parents():
+    source = Input(uid=1, path="test.data", size=50)
+    forest = diamond_forest(source)
+    trace = TraceMock(forest)
+
+    # Both parents of 7 are seeds themselves, so they are never resolved via 7
+    n7 = forest.nodes_by_label[7]
+    seeds = [n7, forest.get_node(5), forest.get_node(6)]
+    assert offsets(trace.taints(seeds)) == [(1, 10), (1, 20), (1, 30)]
+    assert n7.resolved == 0
+
+    # 9 has the same parents as 7: whichever of the two is expanded second
+    # finds both parents visited and does not resolve them again
+    n9 = forest.add(9, parents=(6, 5))
+    n7.resolved = 0
+    assert offsets(trace.taints([n9, n7])) == [(1, 10), (1, 20), (1, 30)]
+    assert n7.resolved + n9.resolved == 2